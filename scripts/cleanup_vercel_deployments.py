@@ -4,528 +4,363 @@ Vercel 部署清理脚本
 
 此脚本用于删除所有处于 Queued 和 Building 状态的 Vercel 部署。
 支持多项目配置，可以同时清理多个项目的部署。
+直接调用 Vercel REST API，不依赖 Vercel CLI。
 """
 
+import logging
 import os
 import sys
-import subprocess
-import re
+import threading
 import time
-import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
 
-
-def log_info(message: str):
-    """输出信息日志"""
-    print(f"ℹ️  {message}")
-
-
-def log_success(message: str):
-    """输出成功日志"""
-    print(f"✅ {message}")
-
-
-def log_warning(message: str):
-    """输出警告日志"""
-    print(f"⚠️  {message}")
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 优先使用更快的 orjson 解析接口响应，未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+
+VERCEL_API_URL = "https://api.vercel.com"
+
+# 需要清理的部署状态
+PENDING_STATES = frozenset({"BUILDING", "QUEUED"})
+# 查询参数形式，由服务端完成状态过滤，只返回需要处理的部署
+PENDING_STATES_PARAM = ",".join(sorted(PENDING_STATES))
+
+# 并发控制：同时处理的项目数、单个项目内同时删除的部署数
+MAX_PROJECT_WORKERS = 8
+MAX_DELETE_WORKERS = 4
+# X-RateLimit-Remaining 低于该值时暂停发送请求，直到限流窗口重置
+RATE_LIMIT_MIN_REMAINING = 1
+
+# 遇到 429 / 5xx 等临时错误时按指数退避自动重试（遵循 Retry-After），
+# 重试耗尽后返回最后一次响应，由调用方按失败处理。
+# 连接失败和读超时不重试，直接抛出原始异常（如 requests.Timeout），避免单个请求卡住数分钟。
+# 单个请求的 Retry-After 等待在 urllib3 内部完成；DELETE_LIMITER 只在重试耗尽后
+# 仍收到 Retry-After，或 X-RateLimit-Remaining 即将用尽时，让所有线程一起暂停。
+RETRY = Retry(
+    total=5,
+    connect=False,
+    read=False,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'DELETE']),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# 全局复用的 HTTPS 会话（keep-alive 连接池），避免每次请求重新握手。
+# 连接池大小由并发上限推导（项目并发数 × 删除并发数），调整并发参数时无需同步修改。
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=MAX_PROJECT_WORKERS * MAX_DELETE_WORKERS,
+    pool_block=True,
+    max_retries=RETRY,
+))
+
+
+# 日志：DEBUG 级别仅在 verbose 模式下输出，参数采用惰性 % 格式化，被丢弃的日志不产生格式化开销
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+logger = logging.getLogger(__name__)
+
+
+class _EmojiFormatter(logging.Formatter):
+    """按日志级别添加前缀"""
+
+    PREFIXES = {
+        logging.DEBUG: "ℹ️  ",
+        logging.INFO: "ℹ️  ",
+        SUCCESS: "✅ ",
+        logging.WARNING: "⚠️  ",
+        logging.ERROR: "❌ ",
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self.PREFIXES.get(record.levelno, "") + super().format(record)
+
+
+def setup_logging(verbose: bool):
+    """配置日志输出到标准输出，verbose 时额外输出 DEBUG 日志（如完整接口响应）"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_EmojiFormatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+class RateLimiter:
+    """根据接口返回的限流响应头按需等待，所有线程共享同一个暂停时间点"""
+
+    def __init__(self, min_remaining: int = RATE_LIMIT_MIN_REMAINING):
+        self._min_remaining = min_remaining
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        """如果此前的响应要求暂停，阻塞到可以继续发送请求"""
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            logger.info("⏱️  触发 API 限流，等待 %.1f 秒…", delay)
+            time.sleep(delay)
+
+    def update(self, response: requests.Response):
+        """
+        根据 Retry-After / X-RateLimit-* 响应头更新下次可发送请求的时间
+        Retry-After 通常已被 RETRY 在重试中消化，这里只处理重试耗尽后的响应
+        """
+        headers = response.headers
+        delay = 0.0
+        try:
+            if 'Retry-After' in headers:
+                delay = float(headers['Retry-After'])
+            elif int(headers.get('X-RateLimit-Remaining', self._min_remaining)) < self._min_remaining:
+                delay = float(headers.get('X-RateLimit-Reset', 0)) - time.time()
+        except ValueError:
+            return
+        if delay > 0:
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
 
 
-def log_error(message: str):
-    """输出错误日志"""
-    print(f"❌ {message}")
+DELETE_LIMITER = RateLimiter()
 
 
-def check_vercel_cli() -> bool:
-    """检查 Vercel CLI 是否已安装"""
-    try:
-        result = subprocess.run(['vercel', '--version'],
-                              capture_output=True, text=True, check=False)
-        if result.returncode == 0:
-            log_info(f"Vercel CLI 版本: {result.stdout.strip()}")
-            return True
-        else:
-            return False
-    except FileNotFoundError:
-        return False
-
-
-def get_project_list() -> List[str]:
+def get_project_list(input_projects: str, default_projects: str) -> List[str]:
     """获取要处理的项目列表"""
     # 优先使用工作流输入的项目列表
-    input_projects = os.getenv('INPUT_PROJECTS', '').strip()
+    input_projects = input_projects.strip()
     if input_projects:
         projects = [p.strip() for p in input_projects.split(',') if p.strip()]
-        log_info(f"使用工作流输入的项目列表: {projects}")
+        logger.info("使用工作流输入的项目列表: %s", projects)
         return projects
 
     # 使用默认项目列表
-    default_projects = os.getenv('DEFAULT_PROJECTS', '').strip()
+    default_projects = default_projects.strip()
     if default_projects:
         projects = [p.strip() for p in default_projects.split(',') if p.strip()]
-        log_info(f"使用默认项目列表: {projects}")
+        logger.info("使用默认项目列表: %s", projects)
         return projects
 
     # 如果都没有配置，返回空列表
-    log_warning("没有配置任何项目，请在工作流文件中设置 DEFAULT_PROJECTS 或通过手动触发提供项目列表")
+    logger.warning("没有配置任何项目，请在工作流文件中设置 DEFAULT_PROJECTS 或通过手动触发提供项目列表")
     return []
 
 
-def list_deployments(project: str, token: str) -> Optional[str]:
-    """列出指定项目的部署"""
+def list_deployments(project: str) -> Optional[dict]:
+    """通过 Vercel REST API 列出指定项目处于 Building/Queued 状态的部署"""
     try:
-        # 尝试不同的命令参数组合
-        commands_to_try = [
-            ['vercel', 'list', project, '--token', token],
-            ['vercel', 'ls', project, '--token', token],
-            ['vercel', 'deployments', 'list', project, '--token', token],
-        ]
-
-        for i, cmd in enumerate(commands_to_try):
-            log_info(f"🚀 尝试命令 {i+1}: {' '.join(cmd[:3])} [项目名] --token [隐藏]")
-
-            # 尝试不同的环境和缓冲设置
-            env = os.environ.copy()
-            env['FORCE_COLOR'] = '0'  # 禁用颜色输出
-            env['NO_COLOR'] = '1'
-
-            # 尝试不同的执行方式
-            execution_methods = [
-                # 方法1: 标准方式
-                {'capture_output': True, 'text': True, 'shell': False},
-                # 方法2: 使用 shell
-                {'capture_output': True, 'text': True, 'shell': True},
-                # 方法3: 不缓冲输出
-                {'stdout': subprocess.PIPE, 'stderr': subprocess.PIPE, 'text': True, 'shell': False, 'bufsize': 0},
-            ]
-
-            result = None
-            for method_idx, method_kwargs in enumerate(execution_methods):
-                try:
-                    log_info(f"   尝试执行方法 {method_idx + 1}")
-
-                    if method_kwargs.get('shell'):
-                        # 对于 shell=True，需要将命令转换为字符串
-                        shell_cmd = ' '.join([f'"{part}"' if ' ' in part else part for part in cmd])
-                        result = subprocess.run(
-                            shell_cmd,
-                            timeout=30,
-                            env=env,
-                            universal_newlines=True,
-                            **{k: v for k, v in method_kwargs.items() if k != 'shell'}
-                        )
-                    else:
-                        result = subprocess.run(
-                            cmd,
-                            timeout=30,
-                            env=env,
-                            universal_newlines=True,
-                            **method_kwargs
-                        )
-
-                    log_info(f"   方法 {method_idx + 1} 执行成功")
-                    break
-
-                except Exception as method_error:
-                    log_info(f"   方法 {method_idx + 1} 失败: {method_error}")
-                    continue
-
-            if result is None:
-                log_error(f"所有执行方法都失败了")
-                continue
-
-            log_info(f"📋 命令 {i+1} 返回码: {result.returncode}")
-
-            # 打印完整的原始输出用于调试
-            verbose = os.getenv('VERCEL_CLEANUP_VERBOSE', 'false').lower() in ['1', 'true', 'yes']
-            if result.stdout:
-                log_info(f"📤 标准输出长度: {len(result.stdout)} 字符")
-                if verbose:
-                    log_info("🔍 完整标准输出内容:")
-                    stdout_lines = result.stdout.split('\n')
-                    for j, line in enumerate(stdout_lines):
-                        log_info(f"   stdout[{j:02d}]: {repr(line)}")
-                else:
-                    head = '\n'.join(result.stdout.split('\n')[:3])
-                    if head:
-                        log_info(f"   stdout 预览: {repr(head)} … (更多请设 VERCEL_CLEANUP_VERBOSE=true)")
-
-            if result.stderr:
-                log_info(f"⚠️  标准错误输出长度: {len(result.stderr)} 字符")
-                if verbose:
-                    log_info("🔍 完整错误输出内容:")
-                    stderr_lines = result.stderr.split('\n')
-                    for j, line in enumerate(stderr_lines):
-                        if line.strip():  # 只显示非空行
-                            log_info(f"   stderr[{j:02d}]: {repr(line)}")
-                else:
-                    head = '\n'.join([l for l in result.stderr.split('\n') if l.strip()][:3])
-                    if head:
-                        log_info(f"   stderr 预览: {repr(head)} … (更多请设 VERCEL_CLEANUP_VERBOSE=true)")
-
-            # 合并 stdout 和 stderr，因为有些工具会将表格输出到 stderr
-            combined_output = ""
-            if result.stdout:
-                combined_output += result.stdout
-            if result.stderr:
-                combined_output += "\n" + result.stderr
-
-            if combined_output.strip():
-                log_success(f"✅ 获取部署列表成功")
-                return combined_output
-            else:
-                log_warning(f"⚠️  命令 {i+1} 没有输出内容")
-
-        log_error(f"❌ 所有命令都无法获取项目 {project} 的有效输出")
-        return None
-
-    except subprocess.TimeoutExpired:
-        log_error(f"获取项目 {project} 的部署列表超时")
+        logger.info("🚀 请求部署列表: GET /v6/deployments (项目: %s)", project)
+        response = SESSION.get(
+            f"{VERCEL_API_URL}/v6/deployments",
+            params={"projectId": project, "state": PENDING_STATES_PARAM, "limit": 100},
+            timeout=30,
+        )
+        logger.info("📋 接口返回码: %s", response.status_code)
+
+        # response.text 需要解码整个响应体，仅在输出 DEBUG 日志时读取
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 完整响应内容: %s", response.text)
+
+        if not response.ok:
+            logger.error("❌ 获取项目 %s 的部署列表失败: %s", project, response.text.strip())
+            return None
+
+        logger.log(SUCCESS, "✅ 获取部署列表成功")
+        return _json_loads(response.content)
+
+    except requests.Timeout:
+        logger.error("获取项目 %s 的部署列表超时", project)
         return None
     except Exception as e:
-        log_error(f"获取项目 {project} 的部署列表时发生异常: {e}")
+        logger.error("获取项目 %s 的部署列表时发生异常: %s", project, e)
         return None
 
 
-def parse_deployments(output: str) -> List[Tuple[str, str]]:
+def filter_pending(deployments_json: dict) -> List[Tuple[str, str]]:
     """
-    解析 vercel list 的输出，提取处于 Building 和 Queued 状态的部署
-    返回 (deployment_url, status) 的列表
+    从接口返回的 JSON 中提取处于 Building 和 Queued 状态的部署
+    返回 (deployment_uid, status) 的列表
     """
-    deployments = []
-    lines = output.split('\n')
-
-    log_info("🔍 开始解析 vercel list 输出...")
-    log_info(f"📄 原始输出共 {len(lines)} 行")
-
-    # 根据环境变量控制是否打印原始输出
-    verbose = os.getenv('VERCEL_CLEANUP_VERBOSE', 'false').lower() in ['1', 'true', 'yes']
-    if verbose:
-        log_info("📋 原始输出内容:")
-        for i, line in enumerate(lines):
-            if line.strip():
-                log_info(f"第{i+1:02d}行: {repr(line)}")
-
-    # 查找部署列表的开始（跳过标题行）
-    start_parsing = False
-    header_found = False
-    parse_count = 0
-    MAX_PARSE_ROWS = 10
-
-    for i, line in enumerate(lines):
-        original_line = line
-        line = line.strip()
-        if not line:
-            continue
-
-        # 查找表头（多种可能的格式）
-        if not header_found and ('Age' in line or 'Deployment' in line or 'Status' in line or 'Environment' in line or 'Duration' in line):
-            log_info(f"✅ 找到表头行(第{i+1}行): {repr(original_line)}")
-            header_found = True
-            start_parsing = True
-            continue
-
-        # 如果还没找到表头，继续寻找
-        if not start_parsing:
-            continue
-
-        # 尝试多种解析模式（最多处理前 10 行数据行，避免日志噪声与无谓开销）
-        log_info(f"🔎 尝试解析行: {repr(original_line)}")
-        parse_count += 1
-        if parse_count > MAX_PARSE_ROWS:
-            log_info("⏭️  已解析前 10 行数据，后续行跳过")
-            break
-
-        # 多种解析模式，涵盖不同的输出格式
-        patterns = [
-            # 匹配带 ● 符号的状态
-            r'^\s*\S+\s+(https://[^\s]+)\s+●\s*(Building|Queued|building|queued)',
-            # 匹配不带 ● 符号的状态
-            r'^\s*\S+\s+(https://[^\s]+)\s+(Building|Queued|building|queued)',
-            # 更宽松的匹配
-            r'(https://[^\s]+).*?\s+(Building|Queued|building|queued)',
-            # 匹配任何包含URL和状态的行
-            r'(https://[^\s]+).*?(Building|Queued|building|queued)',
-            # 匹配部分单词（如果状态被截断）
-            r'(https://[^\s]+).*?\s+(Build|Queue|build|queue)',
-        ]
-
-        matched = False
-        for pattern_idx, pattern in enumerate(patterns):
-            match = re.search(pattern, original_line, re.IGNORECASE)
-            if match:
-                deployment_url = match.group(1)
-                status = match.group(2)
-                deployments.append((deployment_url, status))
-                log_success(f"✨ 模式{pattern_idx+1}匹配成功: {deployment_url} (状态: {status})")
-                matched = True
-                break
-
-        if not matched:
-            log_info(f"⚪ 该行不匹配任何模式: {repr(original_line)}")
-
-    if not header_found:
-        log_warning("⚠️  未找到表头，可能输出格式发生变化")
-        log_info("🔄 启用备用解析策略，尝试解析所有行（最多前 10 行）...")
-
-        # 备用策略：解析所有行，不依赖表头
-        parse_count = 0
-        for i, original_line in enumerate(lines):
-            if parse_count >= 10:
-                log_info("⏭️  备用策略已解析前 10 行，后续行跳过")
-                break
-            line = original_line.strip()
-            if not line or line.startswith('>') or line.startswith('You can learn more'):
-                continue
-
-            log_info(f"🔍 备用策略解析第{i+1}行: {repr(original_line)}")
-
-            # 如果行中包含 https URL，尝试各种解析模式
-            if 'https://' in original_line:
-                patterns = [
-                    # 尝试从完整表格行解析
-                    r'(https://[^\s]+).*?●\s*(Building|Queued|building|queued)',
-                    r'(https://[^\s]+).*?(Building|Queued|building|queued)',
-                    # 如果只有URL，假设相邻行可能包含状态
-                    r'^(https://[^\s]+)',
-                ]
-
-                matched = False
-                for pattern_idx, pattern in enumerate(patterns):
-                    match = re.search(pattern, original_line, re.IGNORECASE)
-                    if match:
-                        if len(match.groups()) >= 2:  # 包含状态
-                            deployment_url = match.group(1)
-                            status = match.group(2)
-                            deployments.append((deployment_url, status))
-                            log_success(f"✨ 备用模式{pattern_idx+1}匹配成功: {deployment_url} (状态: {status})")
-                            matched = True
-                            break
-                        else:  # 只有 URL，查看前后行寻找状态
-                            deployment_url = match.group(1)
-                            log_info(f"🔗 找到 URL: {deployment_url}，查找状态...")
-
-                            # 查看前后几行寻找 Building 或 Queued 状态
-                            search_range = range(max(0, i-2), min(len(lines), i+3))
-                            for j in search_range:
-                                if i == j:
-                                    continue
-                                search_line = lines[j].strip()
-                                if re.search(r'\b(Building|Queued|building|queued)\b', search_line, re.IGNORECASE):
-                                    status_match = re.search(r'\b(Building|Queued|building|queued)\b', search_line, re.IGNORECASE)
-                                    if status_match:
-                                        status = status_match.group(1)
-                                        deployments.append((deployment_url, status))
-                                        log_success(f"✨ 在第{j+1}行找到状态: {deployment_url} (状态: {status})")
-                                        matched = True
-                                        break
-
-                            if matched:
-                                break
-
-                if not matched:
-                    log_info(f"⚪ 该行未匹配: {repr(original_line)}")
-
-    # 最激进的备用策略：如果我们只收到了 URL 列表，但没有状态信息
-    if len(deployments) == 0 and len([l for l in lines if 'https://' in l and l.strip()]) >= 3:
-        log_warning("🚨 启用最激进备用策略：基于 URL 模式推测状态（最多取前 3 个）")
-        log_warning("⚠️  注意：此策略存在风险，可能误删除部署")
-
-        url_lines = [l.strip() for l in lines if 'https://' in l and l.strip()]
-        log_info(f"📋 找到 {len(url_lines)} 个 URL")
-
-        # 假设最新的几个部署（前3个）可能处于 Building/Queued 状态
-        for i, url_line in enumerate(url_lines[:3]):  # 只处理前3个
-            if 'https://' in url_line:
-                url_match = re.search(r'(https://[^\s]+)', url_line)
-                if url_match:
-                    deployment_url = url_match.group(1)
-                    # 推测状态：第一个可能是 Building，其他可能是 Queued
-                    assumed_status = "Building" if i == 0 else "Queued"
-
-                    log_warning(f"🤔 推测部署 {deployment_url} 状态为: {assumed_status}")
-                    log_warning(f"   (基于您终端输出中显示的前{i+1}个部署)")
-
-                    # 询问用户确认（通过环境变量）
-                    auto_confirm = os.getenv('AUTO_CONFIRM_AGGRESSIVE_CLEANUP', '').lower() in ['true', '1', 'yes']
-                    if auto_confirm:
-                        deployments.append((deployment_url, assumed_status))
-                        log_warning(f"🤖 自动确认删除: {deployment_url} (状态: {assumed_status})")
-                    else:
-                        log_warning(f"🛑 跳过推测删除（需要设置 AUTO_CONFIRM_AGGRESSIVE_CLEANUP=true 环境变量来启用）")
-
-        if len(deployments) > 0:
-            log_warning(f"⚡ 激进策略找到 {len(deployments)} 个待删除部署")
-
-    log_info(f"📊 解析完成，找到 {len(deployments)} 个待删除部署")
-    return deployments
-
-
-
-
-def delete_deployment(deployment_url: str, token: str) -> bool:
+    return [(d["uid"], d["state"]) for d in deployments_json.get("deployments", [])
+            if d.get("state") in PENDING_STATES]
+
+
+def delete_deployment(deployment_uid: str) -> bool:
     """删除指定的部署"""
     try:
-        cmd = ['vercel', 'rm', deployment_url, '--token', token, '-y']
-        log_info(f"🗑️  执行删除命令: vercel rm [URL] --token [隐藏] -y")
+        # 所有项目共享限流器，仅在接口提示限流时才等待
+        DELETE_LIMITER.wait()
+        logger.info("🗑️  执行删除请求: DELETE /v13/deployments/%s", deployment_uid)
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        response = SESSION.delete(f"{VERCEL_API_URL}/v13/deployments/{deployment_uid}", timeout=60)
+        DELETE_LIMITER.update(response)
 
-        log_info(f"📋 删除命令返回码: {result.returncode}")
-        if result.stdout:
-            log_info(f"📤 删除命令标准输出: {result.stdout.strip()}")
-        if result.stderr:
-            log_info(f"⚠️  删除命令错误输出: {result.stderr.strip()}")
+        logger.info("📋 删除请求返回码: %s", response.status_code)
 
-        if result.returncode == 0:
-            log_success(f"✅ 成功删除部署: {deployment_url}")
+        if response.ok:
+            logger.log(SUCCESS, "✅ 成功删除部署: %s", deployment_uid)
+            return True
+        elif response.status_code == 404:
+            # 前一次请求可能已删除成功但返回了 5xx，重试时得到 404，视为已删除
+            logger.log(SUCCESS, "✅ 部署已不存在（视为已删除）: %s", deployment_uid)
             return True
         else:
-            log_error(f"❌ 删除部署失败 {deployment_url}")
-            log_error(f"   返回码: {result.returncode}")
-            log_error(f"   错误信息: {result.stderr}")
+            logger.error("❌ 删除部署失败 %s", deployment_uid)
+            logger.error("   返回码: %s", response.status_code)
+            logger.error("   错误信息: %s", response.text.strip())
             return False
 
-    except subprocess.TimeoutExpired:
-        log_error(f"⏰ 删除部署 {deployment_url} 超时（60秒）")
+    except requests.Timeout:
+        logger.error("⏰ 删除部署 %s 超时（60秒）", deployment_uid)
         return False
     except Exception as e:
-        log_error(f"💥 删除部署 {deployment_url} 时发生异常: {e}")
+        logger.error("💥 删除部署 %s 时发生异常: %s", deployment_uid, e)
         return False
 
 
-def cleanup_project_deployments(project: str, token: str) -> Tuple[int, int]:
+def cleanup_project_deployments(project: str) -> Tuple[int, int]:
     """
     清理单个项目的部署
     返回 (成功删除数量, 总尝试删除数量)
     """
-    log_info("=" * 60)
-    log_info(f"🎯 开始处理项目: {project}")
+    logger.info("=" * 60)
+    logger.info("🎯 开始处理项目: %s", project)
 
     # 策略说明：保留最新 1 条（列表第 1 个），删除其余
-    log_info("策略：保留最新 1 条 Building/Queued 部署，删除其余")
+    logger.info("策略：保留最新 1 条 Building/Queued 部署，删除其余")
 
     # 获取部署列表
-    output = list_deployments(project, token)
-    if not output:
-        log_warning(f"❌ 无法获取项目 {project} 的部署列表")
+    data = list_deployments(project)
+    if data is None:
+        logger.warning("❌ 无法获取项目 %s 的部署列表", project)
         return 0, 0
 
-    log_info(f"✅ 成功获取项目 {project} 的部署列表")
+    logger.info("✅ 成功获取项目 %s 的部署列表", project)
 
-    # 解析待删除的部署
-    deployments = parse_deployments(output)
+    # 筛选待删除的部署（接口按创建时间倒序返回）
+    deployments = filter_pending(data)
 
     if not deployments:
-        log_info(f"✨ 项目 {project} 没有需要清理的部署（Building/Queued 状态）")
+        logger.info("✨ 项目 %s 没有需要清理的部署（Building/Queued 状态）", project)
         return 0, 0
 
-    log_info(f"🎯 项目 {project} 找到 {len(deployments)} 个待删除部署")
-    for i, (url, status) in enumerate(deployments, 1):
-        log_info(f"  {i}. {url} (状态: {status})")
+    logger.info("🎯 项目 %s 找到 %s 个待删除部署", project, len(deployments))
+    for i, (uid, status) in enumerate(deployments, 1):
+        logger.info("  %s. %s (状态: %s)", i, uid, status)
 
     # 简化策略：始终保留最新 1 条（列表第 1 个），删除其余
-    success_count = 0
-    attempted = 0
-
-    for i, (deployment_url, status) in enumerate(deployments, 1):
-        if i == 1:
-            log_info(f"⏭️  跳过删除（保留最新一条）: {deployment_url} ({status})")
-            continue
-
-        attempted += 1
-        log_info(f"🗑️  [{attempted}/{max(len(deployments)-1, 0)}] 正在删除 {status} 状态的部署: {deployment_url}")
-        if delete_deployment(deployment_url, token):
-            success_count += 1
-        else:
-            log_error(f"❌ 删除失败: {deployment_url}")
+    keep_uid, keep_status = deployments[0]
+    logger.info("⏭️  跳过删除（保留最新一条）: %s (%s)", keep_uid, keep_status)
+    to_delete = deployments[1:]
+    attempted = len(to_delete)
+
+    def delete_one(item: Tuple[int, Tuple[str, str]]) -> bool:
+        idx, (deployment_uid, status) = item
+        logger.info("🗑️  [%s/%s] 正在删除 %s 状态的部署: %s", idx, attempted, status, deployment_uid)
+        if delete_deployment(deployment_uid):
+            return True
+        logger.error("❌ 删除失败: %s", deployment_uid)
+        return False
 
-        # 稍微延迟一下，避免API限制
-        if i < len(deployments):  # 最后一个不需要延迟
-            log_info("⏱️  等待1秒以避免API限制…")
-            time.sleep(1)
+    success_count = 0
+    if to_delete:
+        with ThreadPoolExecutor(max_workers=min(MAX_DELETE_WORKERS, len(to_delete))) as executor:
+            success_count = sum(executor.map(delete_one, enumerate(to_delete, 1)))
 
-    log_success(f"🎉 项目 {project} 处理完成: 成功删除 {success_count}/{attempted} 个部署（共发现 {len(deployments)} 个待处理，跳过 {len(deployments)-attempted} 个）")
+    logger.log(SUCCESS, "🎉 项目 %s 处理完成: 成功删除 %s/%s 个部署（共发现 %s 个待处理，跳过 %s 个）", project, success_count, attempted, len(deployments), len(deployments)-attempted)
     return success_count, attempted
 
 
 def main():
     """主函数"""
-    log_info("🚀 开始 Vercel 部署清理脚本")
-    log_info("=" * 60)
+    # 所有环境变量只在这里读取一次
+    verbose = os.getenv('VERCEL_CLEANUP_VERBOSE', 'false').lower() in {'1', 'true', 'yes'}
+    token = os.getenv('VERCEL_CLI_TOKEN', '')
+    input_projects = os.getenv('INPUT_PROJECTS', '')
+    default_projects = os.getenv('DEFAULT_PROJECTS', '')
+
+    setup_logging(verbose)
+    logger.info("🚀 开始 Vercel 部署清理脚本")
+    logger.info("=" * 60)
 
     # 打印环境信息
-    log_info("🔧 环境信息:")
-    log_info(f"  Python 版本: {sys.version}")
-    log_info(f"  操作系统: {os.uname() if hasattr(os, 'uname') else '未知'}")
-    log_info(f"  当前工作目录: {os.getcwd()}")
+    logger.info("🔧 环境信息:")
+    logger.info("  Python 版本: %s", sys.version)
+    logger.info("  操作系统: %s", os.uname() if hasattr(os, 'uname') else '未知')
+    logger.info("  当前工作目录: %s", os.getcwd())
 
     # 打印环境变量状态
-    log_info("🔑 环境变量状态:")
-    log_info(f"  VERCEL_CLI_TOKEN: {'✅ 已设置' if os.getenv('VERCEL_CLI_TOKEN') else '❌ 未设置'}")
-    log_info(f"  DEFAULT_PROJECTS: '{os.getenv('DEFAULT_PROJECTS', '')}'")
-    log_info(f"  INPUT_PROJECTS: '{os.getenv('INPUT_PROJECTS', '')}'")
-
-    # 检查 Vercel CLI
-    log_info("🛠️  检查 Vercel CLI...")
-    if not check_vercel_cli():
-        log_error("❌ Vercel CLI 未安装或无法访问")
-        sys.exit(1)
+    logger.info("🔑 环境变量状态:")
+    logger.info("  VERCEL_CLI_TOKEN: %s", '✅ 已设置' if token else '❌ 未设置')
+    logger.info("  DEFAULT_PROJECTS: '%s'", default_projects)
+    logger.info("  INPUT_PROJECTS: '%s'", input_projects)
 
     # 检查 token
-    token = os.getenv('VERCEL_CLI_TOKEN')
     if not token:
-        log_error("❌ 未找到 VERCEL_CLI_TOKEN 环境变量")
-        log_error("   请在 GitHub 仓库的 Secrets 中添加 VERCEL_CLI_TOKEN")
+        logger.error("❌ 未找到 VERCEL_CLI_TOKEN 环境变量")
+        logger.error("   请在 GitHub 仓库的 Secrets 中添加 VERCEL_CLI_TOKEN")
         sys.exit(1)
 
-    log_success(f"✅ Token 已配置（长度: {len(token)} 字符）")
+    logger.log(SUCCESS, "✅ Token 已配置（长度: %s 字符）", len(token))
 
     # 获取项目列表
-    projects = get_project_list()
+    projects = get_project_list(input_projects, default_projects)
     if not projects:
-        log_warning("⚠️  没有配置任何项目，脚本将退出")
-        log_warning("   请在工作流文件中设置 DEFAULT_PROJECTS 或通过手动触发提供项目列表")
+        logger.warning("⚠️  没有配置任何项目，脚本将退出")
+        logger.warning("   请在工作流文件中设置 DEFAULT_PROJECTS 或通过手动触发提供项目列表")
         sys.exit(0)
 
-    log_info(f"📋 将处理 {len(projects)} 个项目: {', '.join(projects)}")
+    SESSION.headers['Authorization'] = f"Bearer {token}"
 
-    # 处理每个项目
-    total_success = 0
-    total_attempted = 0
+    logger.info("📋 将处理 %s 个项目: %s", len(projects), ', '.join(projects))
 
-    for i, project in enumerate(projects, 1):
+    # 并发处理每个项目
+    def process(item: Tuple[int, str]) -> Tuple[int, int]:
+        i, project = item
         try:
-            log_info(f"\n📍 [{i}/{len(projects)}] 处理项目: {project}")
-            success, attempted = cleanup_project_deployments(project, token)
-            total_success += success
-            total_attempted += attempted
+            logger.info("\n📍 [%d/%d] 处理项目: %s", i, len(projects), project)
+            return cleanup_project_deployments(project)
         except Exception as e:
-            log_error(f"💥 处理项目 {project} 时发生未预期错误: {e}")
-            import traceback
-            log_error(f"   错误堆栈:\n{traceback.format_exc()}")
-            continue
+            logger.exception("💥 处理项目 %s 时发生未预期错误: %s", project, e)
+            return 0, 0
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PROJECT_WORKERS, len(projects))) as executor:
+        results = list(executor.map(process, enumerate(projects, 1)))
+
+    total_success = sum(success for success, _ in results)
+    total_attempted = sum(attempted for _, attempted in results)
 
     # 输出总结
-    log_info("\n" + "=" * 60)
-    log_info("📊 最终统计:")
-    log_info(f"  🎯 处理项目数量: {len(projects)}")
-    log_info(f"  🔍 发现待删除部署: {total_attempted}")
-    log_info(f"  ✅ 成功删除部署: {total_success}")
-    log_info(f"  ❌ 删除失败部署: {total_attempted - total_success}")
+    logger.info("\n" + "=" * 60)
+    logger.info("📊 最终统计:")
+    logger.info("  🎯 处理项目数量: %s", len(projects))
+    logger.info("  🔍 发现待删除部署: %s", total_attempted)
+    logger.info("  ✅ 成功删除部署: %s", total_success)
+    logger.info("  ❌ 删除失败部署: %s", total_attempted - total_success)
 
     if total_attempted == 0:
-        log_info("🎉 没有找到需要清理的部署，所有项目都很干净！")
+        logger.info("🎉 没有找到需要清理的部署，所有项目都很干净！")
     else:
         if total_success == total_attempted:
-            log_success(f"🎉 完美！成功删除了所有 {total_success} 个待清理部署")
+            logger.log(SUCCESS, "🎉 完美！成功删除了所有 %s 个待清理部署", total_success)
         else:
-            log_warning(f"⚠️  部分删除失败：成功 {total_success}/{total_attempted}")
+            logger.warning("⚠️  部分删除失败：成功 %s/%s", total_success, total_attempted)
 
     if total_success < total_attempted:
-        log_warning("🔍 请查看上面的详细日志了解失败原因")
+        logger.warning("🔍 请查看上面的详细日志了解失败原因")
         sys.exit(1)
     else:
-        log_success("🏁 脚本执行完成！")
+        logger.log(SUCCESS, "🏁 脚本执行完成！")
         sys.exit(0)
 
 